@@ -0,0 +1,209 @@
+import asyncio
+import os
+from collections import Counter
+from contextlib import asynccontextmanager
+
+from fastapi import HTTPException, Request
+from fastapi.routing import APIRoute
+from starlette.exceptions import HTTPException as StarletteHTTPException
+
+from app.resume_parser import DocumentTooLarge, count_pages, extract_text
+
+def _env_int(name: str, default: int) -> int:
+    return int(os.getenv(name, default))
+
+# Request limits (override with environment variables)
+MAX_FILE_BYTES = _env_int("HIRESEINSE_MAX_FILE_BYTES", 10 * 1024 * 1024)
+MAX_FILES = _env_int("HIRESEINSE_MAX_FILES", 50)
+MAX_TOTAL_PAGES = _env_int("HIRESEINSE_MAX_TOTAL_PAGES", 500)
+MAX_TOTAL_CHARS = _env_int("HIRESEINSE_MAX_TOTAL_CHARS", 2_000_000)
+
+# Per-process concurrency: requests doing work, requests allowed to wait, and how long they wait
+MAX_IN_FLIGHT = _env_int("HIRESEINSE_MAX_IN_FLIGHT", 2)
+MAX_QUEUE = _env_int("HIRESEINSE_MAX_QUEUE", 8)
+QUEUE_TIMEOUT = float(os.getenv("HIRESEINSE_QUEUE_TIMEOUT", 30))
+RETRY_AFTER = _env_int("HIRESEINSE_RETRY_AFTER", 5)
+
+COPY_CHUNK_BYTES = 1024 * 1024
+
+# Largest request body worth parsing: every file at its limit plus room for form fields and part headers
+MULTIPART_OVERHEAD_BYTES = 64 * 1024
+MAX_REQUEST_BYTES = MAX_FILES * MAX_FILE_BYTES + MULTIPART_OVERHEAD_BYTES
+
+
+class Rejected(HTTPException):
+    """An HTTP error raised when a request is refused by admission control"""
+
+    def __init__(self, status_code: int, detail: str, retry_after: int = None):
+        headers = {"Retry-After": str(retry_after)} if retry_after is not None else None
+        super().__init__(status_code=status_code, detail=detail, headers=headers)
+
+
+class AdmissionController:
+    """Bounds in-flight work per process and rejects requests quickly once the queue is full"""
+
+    def __init__(self, max_in_flight: int = MAX_IN_FLIGHT, max_queue: int = MAX_QUEUE,
+                 queue_timeout: float = QUEUE_TIMEOUT, retry_after: int = RETRY_AFTER):
+        self.max_in_flight = max_in_flight
+        self.max_queue = max_queue
+        self.queue_timeout = queue_timeout
+        self.retry_after = retry_after
+
+        self._semaphore = asyncio.Semaphore(max_in_flight)
+        self.in_flight = 0
+        self.queued = 0
+        self.admitted = 0
+        self.completed = 0
+        self.rejected = Counter()
+
+    def _retry_after(self) -> int:
+        # Suggest waiting longer the deeper the queue is
+        return self.retry_after * (1 + self.queued // max(self.max_in_flight, 1))
+
+    def reject(self, reason: str, status_code: int, detail: str, retry: bool = False) -> Rejected:
+        """Record a rejection and return the exception to raise"""
+        self.rejected[reason] += 1
+        return Rejected(status_code, detail, self._retry_after() if retry else None)
+
+    @asynccontextmanager
+    async def slot(self):
+        """Hold one of the in-flight work slots for the duration of the block"""
+        if not self._semaphore.locked():
+            # A slot is free: take it without queueing
+            await self._semaphore.acquire()
+        else:
+            if self.queued >= self.max_queue:
+                raise self.reject("queue_full", 429, "Too many requests are queued, try again later", retry=True)
+
+            self.queued += 1
+            try:
+                await asyncio.wait_for(self._semaphore.acquire(), timeout=self.queue_timeout)
+            except asyncio.TimeoutError:
+                raise self.reject("queue_timeout", 503, "Server is busy, try again later", retry=True)
+            finally:
+                self.queued -= 1
+
+        self.in_flight += 1
+        self.admitted += 1
+        try:
+            yield
+        finally:
+            self.in_flight -= 1
+            self.completed += 1
+            self._semaphore.release()
+
+    def metrics(self) -> dict:
+        return {
+            "in_flight": self.in_flight,
+            "queued": self.queued,
+            "max_in_flight": self.max_in_flight,
+            "max_queue": self.max_queue,
+            "admitted": self.admitted,
+            "completed": self.completed,
+            "rejected": dict(self.rejected),
+            "limits": {
+                "max_file_bytes": MAX_FILE_BYTES,
+                "max_files": MAX_FILES,
+                "max_total_pages": MAX_TOTAL_PAGES,
+                "max_total_chars": MAX_TOTAL_CHARS,
+                "max_request_bytes": MAX_REQUEST_BYTES,
+            },
+        }
+
+
+class LimitedRequest(Request):
+    """Request whose multipart parsing stops after MAX_FILES files"""
+
+    def __init__(self, scope, receive, admission: AdmissionController):
+        super().__init__(scope, receive)
+        self.admission = admission
+
+    def form(self, *, max_files=None, max_fields=1000, max_part_size=1024 * 1024):
+        max_files = MAX_FILES if max_files is None else max_files
+        return super().form(max_files=max_files, max_fields=max_fields, max_part_size=max_part_size)
+
+    async def _get_form(self, **kwargs):
+        try:
+            return await super()._get_form(**kwargs)
+        except StarletteHTTPException as exc:
+            # Starlette reports the max_files cut-off as a generic 400
+            if exc.status_code == 400 and str(exc.detail).startswith("Too many files"):
+                raise self.admission.reject(
+                    "too_many_files", 413, f"At most {MAX_FILES} files may be uploaded per request"
+                )
+            raise
+
+
+def admission_route(admission: AdmissionController) -> type:
+    """Build an APIRoute class that applies admission control before the body is read.
+
+    Oversized bodies are refused by Content-Length, and routes that take a request body
+    wait for an in-flight slot (or are rejected) before the upload is parsed.
+    """
+
+    class AdmissionRoute(APIRoute):
+        def get_route_handler(self):
+            handler = super().get_route_handler()
+            takes_body = self.body_field is not None
+
+            async def limited_handler(request: Request):
+                length = request.headers.get("content-length")
+                if length is not None and length.isdigit() and int(length) > MAX_REQUEST_BYTES:
+                    raise admission.reject(
+                        "request_too_large", 413, f"Request body is larger than {MAX_REQUEST_BYTES} bytes"
+                    )
+
+                limited = LimitedRequest(request.scope, request.receive, admission)
+                if not takes_body:
+                    return await handler(limited)
+                async with admission.slot():
+                    return await handler(limited)
+
+            return limited_handler
+
+    return AdmissionRoute
+
+
+class ExtractionBudget:
+    """Saves and extracts the uploads of one request within its size, page and character limits"""
+
+    def __init__(self, admission: AdmissionController):
+        self.admission = admission
+        self.pages = 0
+        self.chars = 0
+
+    def save(self, upload, path: str):
+        """Copy an upload to disk, refusing files larger than MAX_FILE_BYTES"""
+        written = 0
+        with open(path, "wb") as f:
+            while True:
+                chunk = upload.file.read(COPY_CHUNK_BYTES)
+                if not chunk:
+                    break
+                written += len(chunk)
+                if written > MAX_FILE_BYTES:
+                    break
+                f.write(chunk)
+
+        if written > MAX_FILE_BYTES:
+            os.remove(path)
+            raise self.admission.reject(
+                "file_too_large", 413, f"{upload.filename} is larger than {MAX_FILE_BYTES} bytes"
+            )
+
+    def extract(self, path: str) -> str:
+        """Extract text, charging its pages and characters against the request's budget"""
+        self.pages += count_pages(path)
+        if self.pages > MAX_TOTAL_PAGES:
+            os.remove(path)
+            raise self.admission.reject("too_many_pages", 413, f"Uploads exceed {MAX_TOTAL_PAGES} pages in total")
+
+        try:
+            text = extract_text(path, max_chars=MAX_TOTAL_CHARS - self.chars)
+        except DocumentTooLarge:
+            os.remove(path)
+            raise self.admission.reject(
+                "too_many_chars", 413, f"Uploads exceed {MAX_TOTAL_CHARS} extracted characters in total"
+            )
+        self.chars += len(text)
+        return text
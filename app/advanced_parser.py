@@ -48,6 +48,9 @@ SOFT_SKILLS = [
     'strategic planning', 'innovation', 'decision making', 'conflict resolution'
 ]
 
+# Common words ignored when matching keywords
+COMMON_WORDS = {'the', 'a', 'an', 'and', 'or', 'but', 'in', 'on', 'at', 'to', 'for', 'of', 'with', 'by'}
+
 def extract_skills(resume_text: str, job_text: str = "") -> List[str]:
     """Extract skills from resume text, prioritizing those mentioned in job description"""
     resume_lower = resume_text.lower()
@@ -282,6 +285,26 @@ def extract_contact_info(resume_text: str) -> Dict:
     
     return contact
 
+def extract_keywords(text: str) -> set:
+    """Extract the set of lowercase words used for keyword relevance"""
+    return set(re.findall(r'\b\w+\b', text.lower())) - COMMON_WORDS
+
+def keyword_relevance(job_keywords: set, resume_keywords: set) -> float:
+    """Score keyword overlap with the job description (30 points max)"""
+    if not job_keywords:
+        return 0
+    keyword_match_ratio = len(job_keywords.intersection(resume_keywords)) / len(job_keywords)
+    return min(30, keyword_match_ratio * 30)
+
+def content_completeness(sections: Dict) -> int:
+    """Score the presence of key resume sections (40 points max)"""
+    completeness_score = 0
+    if sections['has_summary']: completeness_score += 5
+    if sections['has_experience']: completeness_score += 15
+    if sections['has_education']: completeness_score += 10
+    if sections['has_skills']: completeness_score += 10
+    return completeness_score
+
 def calculate_resume_score(resume_text: str, job_text: str) -> Dict:
     """Calculate comprehensive resume score"""
     sections = analyze_resume_sections(resume_text)
@@ -295,26 +318,12 @@ def calculate_resume_score(resume_text: str, job_text: str) -> Dict:
     }
     
     # Content completeness (40 points max)
-    completeness_score = 0
-    if sections['has_summary']: completeness_score += 5
-    if sections['has_experience']: completeness_score += 15
-    if sections['has_education']: completeness_score += 10
-    if sections['has_skills']: completeness_score += 10
-    
-    score_breakdown['content_completeness'] = completeness_score
+    score_breakdown['content_completeness'] = content_completeness(sections)
     
     # Keyword relevance (30 points max)
-    job_keywords = set(re.findall(r'\b\w+\b', job_text.lower()))
-    resume_keywords = set(re.findall(r'\b\w+\b', resume_text.lower()))
-    
-    # Remove common words
-    common_words = {'the', 'a', 'an', 'and', 'or', 'but', 'in', 'on', 'at', 'to', 'for', 'of', 'with', 'by'}
-    job_keywords -= common_words
-    resume_keywords -= common_words
-    
-    if job_keywords:
-        keyword_match_ratio = len(job_keywords.intersection(resume_keywords)) / len(job_keywords)
-        score_breakdown['keyword_relevance'] = min(30, keyword_match_ratio * 30)
+    score_breakdown['keyword_relevance'] = keyword_relevance(
+        extract_keywords(job_text), extract_keywords(resume_text)
+    )
     
     # Calculate total score
     score_breakdown['total_score'] = sum([
@@ -0,0 +1,201 @@
+import hashlib
+import heapq
+import json
+import os
+import threading
+import time
+
+import numpy as np
+
+# Fixed-width metadata row kept next to the vectors; filenames live in the FeatureCache
+META_DTYPE = np.dtype([
+    ('sha256', 'S32'),
+    ('timestamp', '<f8'),
+])
+
+SUPPORTED_DTYPES = ('float16', 'int8')
+GROW_ROWS = 1024
+BLOCK_ROWS = 65536
+
+
+def content_hash(text: str) -> str:
+    """Return the hex SHA-256 of a resume's extracted text"""
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+def quantize(embedding, dtype: str):
+    """L2-normalize an embedding and quantize it, returning (values, scale)"""
+    vec = np.asarray(embedding, dtype=np.float32).reshape(-1)
+    norm = np.linalg.norm(vec)
+    if norm > 0:
+        vec = vec / norm
+
+    if dtype == 'int8':
+        peak = float(np.abs(vec).max())
+        scale = peak / 127.0 if peak > 0 else 1.0
+        values = np.clip(np.rint(vec / scale), -127, 127).astype(np.int8)
+        return values, scale
+
+    return vec.astype(np.float16), 1.0
+
+
+class EmbeddingStore:
+    """Append-only store of quantized, normalized embeddings backed by memory-mapped files.
+
+    Layout of ``path``:
+        store.json   - dim, dtype and number of committed rows
+        vectors.bin  - (capacity, dim) float16 or int8 values
+        scales.bin   - (capacity,) float32 per-vector dequantization scales
+        meta.bin     - (capacity,) META_DTYPE rows (content hash, timestamp)
+    """
+
+    def __init__(self, path: str, dim: int = None, dtype: str = None):
+        """Open the store at ``path``, creating it with ``dim`` (default 384) and ``dtype``
+        (default int8) if needed; raises ValueError if they conflict with an existing store"""
+        if dtype is not None and dtype not in SUPPORTED_DTYPES:
+            raise ValueError(f"Unsupported dtype '{dtype}': use one of {SUPPORTED_DTYPES}")
+
+        self.path = path
+        self._lock = threading.Lock()
+        os.makedirs(path, exist_ok=True)
+
+        header_path = os.path.join(path, "store.json")
+        if os.path.exists(header_path):
+            with open(header_path) as f:
+                header = json.load(f)
+            for name, requested in (("dim", dim), ("dtype", dtype)):
+                if requested is not None and requested != header[name]:
+                    raise ValueError(f"Store at '{path}' has {name} {header[name]!r}, not {requested!r}")
+            self.dim = header["dim"]
+            self.dtype = header["dtype"]
+            self.count = header["count"]
+        else:
+            self.dim = dim or 384
+            self.dtype = dtype or 'int8'
+            self.count = 0
+
+        self._capacity = 0
+        self._open(max(self.count, GROW_ROWS))
+        if not os.path.exists(header_path):
+            self._write_header()
+
+    def __len__(self):
+        return self.count
+
+    def _file(self, name: str) -> str:
+        return os.path.join(self.path, name)
+
+    def _open(self, capacity: int):
+        """(Re)map the backing files, growing them to hold ``capacity`` rows"""
+        files = [
+            ("vectors.bin", np.dtype(self.dtype), (capacity, self.dim)),
+            ("scales.bin", np.dtype('<f4'), (capacity,)),
+            ("meta.bin", META_DTYPE, (capacity,)),
+        ]
+        maps = []
+        for name, dtype, shape in files:
+            size = int(np.prod(shape)) * dtype.itemsize
+            with open(self._file(name), "ab") as f:
+                if f.tell() < size:
+                    f.truncate(size)
+            maps.append(np.memmap(self._file(name), dtype=dtype, mode="r+", shape=shape))
+
+        self._vectors, self._scales, self._meta = maps
+        self._capacity = capacity
+
+    def _write_header(self):
+        tmp_path = self._file("store.json.tmp")
+        with open(tmp_path, "w") as f:
+            json.dump({"dim": self.dim, "dtype": self.dtype, "count": self.count}, f)
+        os.replace(tmp_path, self._file("store.json"))
+
+    def add(self, sha256: str, embedding) -> int:
+        """Append an embedding and return its row"""
+        return self.add_many([(sha256, embedding)])[0]
+
+    def add_many(self, entries) -> list:
+        """Append (sha256, embedding) entries and return their rows.
+
+        The batch is written first and the files are flushed and the header committed once.
+        Callers skip content already stored (the FeatureCache maps hashes to rows).
+        """
+        pending = []
+        for sha256, embedding in entries:
+            values, scale = quantize(embedding, self.dtype)
+            if values.shape[0] != self.dim:
+                raise ValueError(f"Expected a {self.dim}-dim embedding, got {values.shape[0]}")
+            pending.append((sha256, values, scale))
+
+        with self._lock:
+            if not pending:
+                return []
+
+            needed = self.count + len(pending)
+            if needed > self._capacity:
+                self._flush()
+                self._open(max(needed, self._capacity + max(GROW_ROWS, self._capacity // 2)))
+
+            now = time.time()
+            rows = list(range(self.count, needed))
+            for row, (sha256, values, scale) in zip(rows, pending):
+                self._vectors[row] = values
+                self._scales[row] = scale
+                self._meta[row] = (bytes.fromhex(sha256), now)
+            self._flush()
+
+            self.count = needed
+            self._write_header()
+            return rows
+
+    def _flush(self):
+        for mm in (self._vectors, self._scales, self._meta):
+            mm.flush()
+
+    def metadata(self, row: int) -> dict:
+        digest, timestamp = self._meta[row]
+        return {
+            "row": row,
+            "sha256": bytes(digest).ljust(32, b'\0').hex(),
+            "timestamp": float(timestamp),
+        }
+
+    def iter_scores(self, query, rows=None, block_size: int = BLOCK_ROWS):
+        """Yield (row_ids, cosine_similarities) one fixed-size block at a time.
+
+        ``rows`` restricts scoring to a subset of rows; by default every stored vector is scored.
+        """
+        q = np.asarray(query, dtype=np.float32).reshape(-1)
+        norm = np.linalg.norm(q)
+        if norm > 0:
+            q = q / norm
+
+        count = self.count
+        if rows is None:
+            for start in range(0, count, block_size):
+                stop = min(start + block_size, count)
+                block = self._vectors[start:stop].astype(np.float32)
+                yield np.arange(start, stop), (block @ q) * self._scales[start:stop]
+        else:
+            rows = np.asarray(rows, dtype=np.int64)
+            for start in range(0, len(rows), block_size):
+                ids = rows[start:start + block_size]
+                block = self._vectors[ids].astype(np.float32)
+                yield ids, (block @ q) * self._scales[ids]
+
+    def search(self, query, top_k: int = 10, block_size: int = BLOCK_ROWS):
+        """Return the ``top_k`` most similar rows as (row, similarity) pairs, best first"""
+        if top_k < 1:
+            return []
+
+        heap = []
+        for ids, scores in self.iter_scores(query, block_size=block_size):
+            if len(scores) > top_k:
+                keep = np.argpartition(scores, -top_k)[-top_k:]
+                ids, scores = ids[keep], scores[keep]
+            for row, score in zip(ids.tolist(), scores.tolist()):
+                if len(heap) < top_k:
+                    heapq.heappush(heap, (score, row))
+                elif score > heap[0][0]:
+                    heapq.heapreplace(heap, (score, row))
+
+        return [(row, score) for score, row in sorted(heap, reverse=True)]
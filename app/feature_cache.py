@@ -0,0 +1,237 @@
+import json
+import math
+import sqlite3
+import threading
+import time
+import uuid
+from typing import Dict, List
+
+import numpy as np
+
+from app.advanced_parser import (
+    analyze_resume_sections,
+    content_completeness,
+    extract_certifications,
+    extract_education,
+    extract_experience,
+    extract_keywords,
+    extract_skills,
+)
+
+# Relative weight of each score component; the defaults reproduce plain similarity ranking
+DEFAULT_WEIGHTS = {
+    'similarity': 1.0,
+    'skill_match': 0.0,
+    'experience_match': 0.0,
+    'keyword_relevance': 0.0,
+    'content_completeness': 0.0,
+}
+
+# Years of experience treated as a full match when the job description names none
+DEFAULT_EXPERIENCE_YEARS = 10
+
+
+class MissingResumeFeatures(Exception):
+    """Raised when a stored screening refers to resumes whose features are no longer cached"""
+
+    def __init__(self, filenames: List[str]):
+        super().__init__(f"Cached features are missing for: {', '.join(filenames)}")
+        self.filenames = filenames
+
+
+def extract_resume_features(resume_text: str) -> Dict:
+    """Derive the job-independent features of a resume"""
+    sections = analyze_resume_sections(resume_text)
+    return {
+        'skills': extract_skills(resume_text),
+        'experience_years': extract_experience(resume_text),
+        'education': extract_education(resume_text),
+        'certifications': extract_certifications(resume_text),
+        'content_completeness': content_completeness(sections),
+        'keywords': sorted(extract_keywords(resume_text)),
+    }
+
+
+def extract_job_features(job_text: str) -> Dict:
+    """Derive the features of a job description that resumes are scored against"""
+    return {
+        'skills': extract_skills(job_text),
+        'experience_years': extract_experience(job_text),
+        'keywords': sorted(extract_keywords(job_text)),
+    }
+
+
+def skill_match(job_skills: List[str], resume_skills: List[str]) -> float:
+    """Percentage of the job's skills found in the resume"""
+    if not job_skills:
+        return 0.0
+    job_set = {skill.lower() for skill in job_skills}
+    resume_set = {skill.lower() for skill in resume_skills}
+    return round(len(job_set & resume_set) / len(job_set) * 100, 2)
+
+
+def experience_match(required_years: int, resume_years: int) -> float:
+    """Percentage of the required years of experience the resume covers"""
+    required = required_years or DEFAULT_EXPERIENCE_YEARS
+    return round(min(resume_years / required, 1.0) * 100, 2)
+
+
+def normalize_weights(weights: Dict = None) -> Dict:
+    """Validate user supplied weights, filling in defaults for missing components"""
+    if weights is not None and not isinstance(weights, dict):
+        raise ValueError("Weights must map score components to numbers")
+    merged = dict(DEFAULT_WEIGHTS)
+    for name, value in (weights or {}).items():
+        if name not in DEFAULT_WEIGHTS:
+            raise ValueError(f"Unknown score component '{name}': use one of {list(DEFAULT_WEIGHTS)}")
+        if isinstance(value, bool) or not isinstance(value, (int, float)) or not math.isfinite(value):
+            raise ValueError(f"Weight for '{name}' must be a finite number")
+        value = float(value)
+        if value < 0:
+            raise ValueError(f"Weight for '{name}' must not be negative")
+        merged[name] = value
+
+    if sum(merged.values()) <= 0:
+        raise ValueError("At least one weight must be positive")
+    return merged
+
+
+def combine_scores(components: Dict, weights: Dict) -> float:
+    """Weighted average of the score components, each scaled to 0-100"""
+    scaled = {
+        'similarity': components['similarity'],
+        'skill_match': components['skill_match'],
+        'experience_match': components['experience_match'],
+        'keyword_relevance': components['keyword_relevance'] * 100 / 30,
+        'content_completeness': components['content_completeness'] * 100 / 40,
+    }
+    total = sum(weights.values())
+    return round(sum(scaled[name] * weight for name, weight in weights.items()) / total, 2)
+
+
+class FeatureCache:
+    """SQLite-backed cache of per-resume features and the screenings built from them.
+
+    Resumes are keyed by the SHA-256 of their extracted text and point at their row in
+    the EmbeddingStore; screenings keep the job description features and the
+    job-dependent score components so they can be re-weighted without recomputation.
+    """
+
+    def __init__(self, path: str):
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.executescript("""
+            CREATE TABLE IF NOT EXISTS resumes (
+                sha256 TEXT PRIMARY KEY,
+                filename TEXT NOT NULL,
+                embedding_row INTEGER NOT NULL,
+                features TEXT NOT NULL,
+                created REAL NOT NULL
+            );
+            CREATE TABLE IF NOT EXISTS screenings (
+                id TEXT PRIMARY KEY,
+                jd_sha256 TEXT NOT NULL,
+                jd_features TEXT NOT NULL,
+                jd_embedding BLOB NOT NULL,
+                weights TEXT NOT NULL,
+                updated REAL NOT NULL
+            );
+            -- Keyed by position in the batch so identical resumes uploaded twice both survive
+            CREATE TABLE IF NOT EXISTS screening_scores (
+                screening_id TEXT NOT NULL,
+                position INTEGER NOT NULL,
+                sha256 TEXT NOT NULL,
+                filename TEXT NOT NULL,
+                similarity REAL NOT NULL,
+                skill_match REAL NOT NULL,
+                keyword_relevance REAL NOT NULL,
+                PRIMARY KEY (screening_id, position)
+            );
+        """)
+        self._conn.commit()
+
+    def get_resumes(self, hashes: List[str]) -> Dict:
+        """Return {sha256: (embedding_row, features)} for the cached resumes among ``hashes``"""
+        found = {}
+        with self._lock:
+            for sha256 in hashes:
+                row = self._conn.execute(
+                    "SELECT embedding_row, features FROM resumes WHERE sha256 = ?", (sha256,)
+                ).fetchone()
+                if row is not None:
+                    found[sha256] = (row[0], json.loads(row[1]))
+        return found
+
+    def get_filenames(self, hashes: List[str]) -> Dict:
+        """Return {sha256: filename} for the cached resumes among ``hashes``"""
+        found = {}
+        with self._lock:
+            for sha256 in hashes:
+                row = self._conn.execute("SELECT filename FROM resumes WHERE sha256 = ?", (sha256,)).fetchone()
+                if row is not None:
+                    found[sha256] = row[0]
+        return found
+
+    def put_resume(self, sha256: str, filename: str, embedding_row: int, features: Dict):
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO resumes VALUES (?, ?, ?, ?, ?)",
+                (sha256, filename, embedding_row, json.dumps(features), time.time())
+            )
+            self._conn.commit()
+
+    def save_screening(self, jd_sha256: str, jd_features: Dict, jd_embedding, weights: Dict,
+                       scores: List[Dict], screening_id: str = None) -> str:
+        """Create or overwrite a screening and its job-dependent score components"""
+        screening_id = screening_id or uuid.uuid4().hex
+        embedding = np.asarray(jd_embedding, dtype=np.float32).tobytes()
+        with self._lock:
+            with self._conn:
+                self._conn.execute(
+                    "INSERT OR REPLACE INTO screenings VALUES (?, ?, ?, ?, ?, ?)",
+                    (screening_id, jd_sha256, json.dumps(jd_features), embedding,
+                     json.dumps(weights), time.time())
+                )
+                self._conn.execute("DELETE FROM screening_scores WHERE screening_id = ?", (screening_id,))
+                self._conn.executemany(
+                    "INSERT INTO screening_scores VALUES (?, ?, ?, ?, ?, ?, ?)",
+                    [(screening_id, position, s['sha256'], s['filename'], s['similarity'],
+                      s['skill_match'], s['keyword_relevance']) for position, s in enumerate(scores)]
+                )
+        return screening_id
+
+    def set_weights(self, screening_id: str, weights: Dict):
+        with self._lock:
+            self._conn.execute(
+                "UPDATE screenings SET weights = ?, updated = ? WHERE id = ?",
+                (json.dumps(weights), time.time(), screening_id)
+            )
+            self._conn.commit()
+
+    def get_screening(self, screening_id: str) -> Dict:
+        """Return a stored screening; raises KeyError if it does not exist"""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT jd_sha256, jd_features, jd_embedding, weights FROM screenings WHERE id = ?",
+                (screening_id,)
+            ).fetchone()
+            if row is None:
+                raise KeyError(screening_id)
+            scores = self._conn.execute(
+                "SELECT sha256, filename, similarity, skill_match, keyword_relevance "
+                "FROM screening_scores WHERE screening_id = ? ORDER BY position",
+                (screening_id,)
+            ).fetchall()
+
+        return {
+            'id': screening_id,
+            'jd_sha256': row[0],
+            'jd_features': json.loads(row[1]),
+            'jd_embedding': np.frombuffer(row[2], dtype=np.float32),
+            'weights': json.loads(row[3]),
+            'scores': [
+                {'sha256': s[0], 'filename': s[1], 'similarity': s[2],
+                 'skill_match': s[3], 'keyword_relevance': s[4]}
+                for s in scores
+            ],
+        }
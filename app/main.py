@@ -1,31 +1,121 @@
-from fastapi import FastAPI, UploadFile, File
-from typing import List
-import shutil
+from fastapi import FastAPI, UploadFile, File, Form, HTTPException, Query
+from fastapi.concurrency import run_in_threadpool
+from typing import List, Optional
+import json
 
-from app.resume_parser import extract_text
-from app.nlp_utils import rank_resumes
+from app.admission import AdmissionController, ExtractionBudget, admission_route
+from app.nlp_utils import screen_resumes, rescore_screening, search_store
+from app.embedding_store import EmbeddingStore
+from app.feature_cache import FeatureCache, MissingResumeFeatures
+from app.skill_index import SkillIndex
 
 app = FastAPI()
 
+# Quantized embeddings of every resume seen so far
+embedding_store = EmbeddingStore("embeddings", dtype="int8")
+
+# Parsed resume features and stored screenings for instant re-ranking
+feature_cache = FeatureCache("embeddings/features.db")
+
+# Inverted index of skills, certifications, education and experience for boolean filtering
+skill_index = SkillIndex("embeddings/skill_index.jsonl")
+
+# Bounded in-flight work and upload limits for this process; upload routes hold a slot while they run
+admission = AdmissionController()
+app.router.route_class = admission_route(admission)
+
+def parse_weights(weights: Optional[str]):
+    if not weights:
+        return None
+    try:
+        parsed = json.loads(weights)
+    except json.JSONDecodeError:
+        raise HTTPException(status_code=400, detail="weights must be a JSON object")
+    if not isinstance(parsed, dict):
+        raise HTTPException(status_code=400, detail="weights must be a JSON object")
+    return parsed
+
+def read_upload(upload: UploadFile, folder: str, budget: ExtractionBudget) -> str:
+    """Save an upload under ``folder`` and return its extracted text"""
+    path = f"{folder}/{upload.filename}"
+    budget.save(upload, path)
+    try:
+        return budget.extract(path)
+    except HTTPException:
+        raise
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
 @app.post("/rank/")
-async def rank_resumes_api(job_desc: UploadFile = File(...), resumes: List[UploadFile] = File(...)):
-    # Save job description
-    jd_path = f"job_descriptions/{job_desc.filename}"
-    with open(jd_path, "wb") as f:
-        shutil.copyfileobj(job_desc.file, f)
-
-    # Extract JD text
-    jd_text = extract_text(jd_path)
-
-    # Save and extract resumes
-    resume_texts = []
-    for resume in resumes:
-        res_path = f"resumes/{resume.filename}"
-        with open(res_path, "wb") as f:
-            shutil.copyfileobj(resume.file, f)
-        text = extract_text(res_path)
-        resume_texts.append((resume.filename, text))
-
-    # Rank resumes
-    results = rank_resumes(jd_text, resume_texts)
-    return {"results": results}
+async def rank_resumes_api(job_desc: UploadFile = File(...), resumes: List[UploadFile] = File(...),
+                           weights: Optional[str] = Form(None)):
+    weights = parse_weights(weights)
+
+    def run():
+        budget = ExtractionBudget(admission)
+
+        # Save and extract the JD and resumes
+        jd_text = read_upload(job_desc, "job_descriptions", budget)
+        resume_texts = [(resume.filename, read_upload(resume, "resumes", budget)) for resume in resumes]
+
+        # Rank resumes
+        try:
+            return screen_resumes(jd_text, resume_texts, embedding_store, feature_cache,
+                                  weights=weights, index=skill_index)
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+
+    screening_id, results = await run_in_threadpool(run)
+    return {"screening_id": screening_id, "results": results}
+
+@app.post("/screenings/{screening_id}/rescore")
+async def rescore_screening_api(screening_id: str, weights: Optional[str] = Form(None),
+                                job_desc: Optional[UploadFile] = File(None)):
+    weights = parse_weights(weights)
+
+    def run():
+        # Optional edited job description
+        jd_text = None
+        if job_desc is not None:
+            jd_text = read_upload(job_desc, "job_descriptions", ExtractionBudget(admission))
+
+        try:
+            return rescore_screening(screening_id, embedding_store, feature_cache,
+                                     weights=weights, job_description=jd_text)
+        except KeyError:
+            raise HTTPException(status_code=404, detail=f"Screening '{screening_id}' not found")
+        except MissingResumeFeatures as e:
+            # The screening exists but can only be rebuilt by uploading its resumes again
+            raise HTTPException(status_code=409, detail=str(e))
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+
+    results = await run_in_threadpool(run)
+    return {"screening_id": screening_id, "results": results}
+
+@app.post("/search/")
+async def search_resumes_api(job_desc: UploadFile = File(...), top_k: int = Query(10, ge=1)):
+    def run():
+        # Score against every stored resume embedding
+        jd_text = read_upload(job_desc, "job_descriptions", ExtractionBudget(admission))
+        return search_store(jd_text, embedding_store, feature_cache, top_k=top_k)
+
+    results = await run_in_threadpool(run)
+    return {"total_resumes": len(embedding_store), "results": results}
+
+@app.get("/candidates/")
+async def filter_candidates_api(q: str, limit: int = Query(100, ge=1)):
+    # Boolean filter over indexed resumes, e.g. "python AND kubernetes AND >=5 years AND master's"
+    try:
+        doc_ids = skill_index.search(q)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return {
+        "query": q,
+        "total": len(doc_ids),
+        "candidates": [skill_index.document(int(doc_id)) for doc_id in doc_ids[:limit]]
+    }
+
+@app.get("/metrics")
+async def metrics_api():
+    return admission.metrics()
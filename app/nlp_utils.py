@@ -1,20 +1,148 @@
-from sentence_transformers import SentenceTransformer, util
+from sentence_transformers import SentenceTransformer
+
+from app.advanced_parser import keyword_relevance
+from app.embedding_store import content_hash
+from app.feature_cache import (
+    MissingResumeFeatures,
+    combine_scores,
+    experience_match,
+    extract_job_features,
+    extract_resume_features,
+    normalize_weights,
+    skill_match,
+)
 
 # Load a lightweight transformer model (fast & accurate)
 model = SentenceTransformer('all-MiniLM-L6-v2')
 
-def rank_resumes(job_description, resumes):
-    jd_embedding = model.encode(job_description, convert_to_tensor=True)
+def search_store(job_description, store, cache, top_k=10):
+    """Rank every resume held in the embedding store against a job description"""
+    jd_embedding = model.encode(job_description, convert_to_numpy=True)
+
+    matches = [(store.metadata(row)["sha256"], similarity)
+               for row, similarity in store.search(jd_embedding, top_k=top_k)]
+    filenames = cache.get_filenames([sha256 for sha256, _ in matches])
+    return [{
+        "filename": filenames.get(sha256),
+        "sha256": sha256,
+        "similarity": round(similarity * 100, 2)
+    } for sha256, similarity in matches]
 
+def _ranked_results(scores, resume_features, jd_features, weights):
+    """Combine job-dependent scores with cached resume features into a ranked list"""
     results = []
-    for filename, resume_text in resumes:
-        res_embedding = model.encode(resume_text, convert_to_tensor=True)
-        similarity = util.pytorch_cos_sim(jd_embedding, res_embedding).item()
+    for entry in scores:
+        features = resume_features[entry["sha256"]]
+        components = {
+            "similarity": entry["similarity"],
+            "skill_match": entry["skill_match"],
+            "experience_match": experience_match(jd_features["experience_years"], features["experience_years"]),
+            "keyword_relevance": entry["keyword_relevance"],
+            "content_completeness": features["content_completeness"],
+        }
         results.append({
-            "filename": filename,
-            "similarity": round(similarity * 100, 2)  # percentage match
+            "filename": entry["filename"],
+            **components,
+            "experience_years": features["experience_years"],
+            "skills": features["skills"],
+            "score": combine_scores(components, weights)
         })
 
-    # Sort by similarity
-    results.sort(key=lambda x: x["similarity"], reverse=True)
+    results.sort(key=lambda x: x["score"], reverse=True)
     return results
+
+def _similarities(store, jd_embedding, rows):
+    similarities = {}
+    for ids, scores in store.iter_scores(jd_embedding, rows=rows):
+        for row, score in zip(ids.tolist(), scores.tolist()):
+            similarities[row] = round(score * 100, 2)
+    return similarities
+
+def screen_resumes(job_description, resumes, store, cache, weights=None, index=None):
+    """Rank resumes and persist their features so the screening can be re-scored later.
+
+    Only resumes whose text has not been seen before are parsed and encoded; when a
+    SkillIndex is given, every resume is also added to it for boolean filtering.
+    Returns (screening_id, results).
+    """
+    weights = normalize_weights(weights)
+    jd_embedding = model.encode(job_description, convert_to_numpy=True)
+    jd_features = extract_job_features(job_description)
+
+    hashes = [content_hash(text) for _, text in resumes]
+    cached = cache.get_resumes(hashes)
+
+    # Parse and encode the resumes we have not seen before in one batch
+    new = {}
+    for (filename, text), sha256 in zip(resumes, hashes):
+        if sha256 not in cached and sha256 not in new:
+            new[sha256] = (filename, text)
+    if new:
+        embeddings = model.encode([text for _, text in new.values()], convert_to_numpy=True)
+        rows = store.add_many(list(zip(new, embeddings)))
+        for (sha256, (filename, text)), row in zip(new.items(), rows):
+            features = extract_resume_features(text)
+            cache.put_resume(sha256, filename, row, features)
+            cached[sha256] = (row, features)
+
+    if index is not None:
+        for (filename, _), sha256 in zip(resumes, hashes):
+            if sha256 not in index:
+                index.add(sha256, filename, cached[sha256][1])
+
+    similarities = _similarities(store, jd_embedding, [cached[sha256][0] for sha256 in hashes])
+    scores = []
+    for (filename, _), sha256 in zip(resumes, hashes):
+        row, features = cached[sha256]
+        scores.append({
+            "sha256": sha256,
+            "filename": filename,
+            "similarity": similarities[row],
+            "skill_match": skill_match(jd_features["skills"], features["skills"]),
+            "keyword_relevance": keyword_relevance(set(jd_features["keywords"]), set(features["keywords"]))
+        })
+
+    screening_id = cache.save_screening(content_hash(job_description), jd_features, jd_embedding, weights, scores)
+    resume_features = {sha256: features for sha256, (_, features) in cached.items()}
+    return screening_id, _ranked_results(scores, resume_features, jd_features, weights)
+
+def rescore_screening(screening_id, store, cache, weights=None, job_description=None):
+    """Re-rank a stored screening with new weights and/or an edited job description.
+
+    Only the components affected by the change are recomputed: new weights alone
+    reuse every stored score, and an edited job description re-encodes the JD once
+    and re-scores against the cached resume embeddings and features.
+    Raises KeyError if the screening does not exist and MissingResumeFeatures if any of
+    its resumes are no longer in the cache.
+    """
+    screening = cache.get_screening(screening_id)
+    weights = normalize_weights(weights if weights is not None else screening["weights"])
+    jd_features = screening["jd_features"]
+    jd_embedding = screening["jd_embedding"]
+    jd_sha256 = screening["jd_sha256"]
+    scores = screening["scores"]
+    cached = cache.get_resumes([entry["sha256"] for entry in scores])
+    missing = [entry["filename"] for entry in scores if entry["sha256"] not in cached]
+    if missing:
+        raise MissingResumeFeatures(missing)
+
+    if job_description is not None and content_hash(job_description) != jd_sha256:
+        jd_sha256 = content_hash(job_description)
+        new_features = extract_job_features(job_description)
+        jd_embedding = model.encode(job_description, convert_to_numpy=True)
+        similarities = _similarities(store, jd_embedding, [cached[entry["sha256"]][0] for entry in scores])
+
+        for entry in scores:
+            row, features = cached[entry["sha256"]]
+            entry["similarity"] = similarities[row]
+            if new_features["skills"] != jd_features["skills"]:
+                entry["skill_match"] = skill_match(new_features["skills"], features["skills"])
+            if new_features["keywords"] != jd_features["keywords"]:
+                entry["keyword_relevance"] = keyword_relevance(set(new_features["keywords"]), set(features["keywords"]))
+        jd_features = new_features
+        cache.save_screening(jd_sha256, jd_features, jd_embedding, weights, scores, screening_id=screening_id)
+    else:
+        cache.set_weights(screening_id, weights)
+
+    resume_features = {sha256: features for sha256, (_, features) in cached.items()}
+    return _ranked_results(scores, resume_features, jd_features, weights)
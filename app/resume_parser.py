@@ -2,19 +2,36 @@ import os
 import fitz  # PyMuPDF
 import docx
 
-def extract_text(file_path: str) -> str:
+class DocumentTooLarge(ValueError):
+    """Raised when a document exceeds the configured page or character limits"""
+
+def count_pages(file_path: str) -> int:
+    """Return the number of pages in a PDF (other formats count as a single page)"""
+    if os.path.splitext(file_path)[1].lower() == ".pdf":
+        with fitz.open(file_path) as pdf:
+            return pdf.page_count
+    return 1
+
+def extract_text(file_path: str, max_chars: int = None) -> str:
     ext = os.path.splitext(file_path)[1].lower()
+    name = os.path.basename(file_path)
     
     if ext == ".pdf":
         text = ""
         with fitz.open(file_path) as pdf:
             for page in pdf:
                 text += page.get_text()
+                # Stop reading as soon as the document is over the limit
+                if max_chars is not None and len(text) > max_chars:
+                    raise DocumentTooLarge(f"{name}: extracted text exceeds {max_chars} characters")
         return text
 
     elif ext == ".docx":
         doc = docx.Document(file_path)
-        return "\n".join([para.text for para in doc.paragraphs])
+        text = "\n".join([para.text for para in doc.paragraphs])
+        if max_chars is not None and len(text) > max_chars:
+            raise DocumentTooLarge(f"{name}: extracted text exceeds {max_chars} characters")
+        return text
 
     else:
         raise ValueError("Unsupported file format: Only .pdf and .docx are allowed.")
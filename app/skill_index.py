@@ -0,0 +1,366 @@
+import json
+import os
+import re
+import threading
+from array import array
+from typing import Dict, List
+
+import numpy as np
+
+# Resumes are bucketed into "at least N years" posting lists at these thresholds
+EXPERIENCE_BUCKETS = (1, 2, 3, 5, 7, 10, 15, 20)
+
+# Education levels from extract_education, normalized and ranked for ">=" queries
+EDUCATION_LEVELS = {
+    "High School": "high_school",
+    "Certificate": "certificate",
+    "Diploma": "diploma",
+    "Associate Degree": "associate",
+    "Bachelor's Degree": "bachelor",
+    "Master's Degree": "master",
+    "MBA": "mba",
+    "Doctorate": "phd",
+    "Ph.D.": "phd",
+}
+EDUCATION_RANK = {
+    "high_school": 1, "certificate": 1, "diploma": 2, "associate": 3,
+    "bachelor": 4, "master": 5, "mba": 5, "phd": 6,
+}
+EDUCATION_ALIASES = {
+    "high school": "high_school", "high_school": "high_school", "certificate": "certificate", "diploma": "diploma",
+    "associate": "associate", "associates": "associate", "associate's": "associate",
+    "bachelor": "bachelor", "bachelors": "bachelor", "bachelor's": "bachelor", "bs": "bachelor", "ba": "bachelor",
+    "master": "master", "masters": "master", "master's": "master", "ms": "master", "msc": "master",
+    "mba": "mba", "phd": "phd", "ph.d.": "phd", "ph.d": "phd", "doctorate": "phd",
+}
+
+FIELD_PREFIXES = {
+    "skill": "skill", "skills": "skill",
+    "cert": "cert", "certification": "cert", "certifications": "cert",
+    "edu": "edu", "education": "edu",
+    "exp": "exp", "experience": "exp", "years": "exp",
+}
+
+TOKEN_PATTERN = re.compile(r"""
+    (?P<paren>[()])
+  | (?P<qfield>[a-z_]+):"(?P<qvalue>[^"]*)"
+  | "(?P<quoted>[^"]*)"
+  | (?P<compare>(?:(?!(?:and|or|not)\b)(?P<field>[a-z_]+)\s*)?(?P<op>>=|<=|≥|≤|>|<)\s*
+        (?:"(?P<cvalue>[^"]*)"|(?P<value>[\w.'+#-]+))(?:\s*(?:years?|yrs?)\b)?)
+  | (?P<years>(?P<count>\d+)\s*\+?\s*(?:years?|yrs?)\b)
+  | (?P<word>[^\s()"]+)
+""", re.VERBOSE | re.IGNORECASE)
+
+OPERATORS = {"AND", "OR", "NOT"}
+
+
+def normalize(value: str) -> str:
+    return " ".join(value.lower().split())
+
+
+def education_levels(education: str) -> List[str]:
+    """Map an extract_education summary to normalized education levels"""
+    return sorted({EDUCATION_LEVELS[part] for part in education.split("; ") if part in EDUCATION_LEVELS})
+
+
+def index_terms(features: Dict) -> List[str]:
+    """Return the posting-list terms for a resume's extracted features"""
+    terms = {f"skill:{normalize(skill)}" for skill in features.get("skills", [])}
+    terms |= {f"cert:{normalize(cert)}" for cert in features.get("certifications", [])}
+
+    levels = education_levels(features.get("education", ""))
+    terms |= {f"edu:{level}" for level in levels}
+    if levels:
+        top = max(EDUCATION_RANK[level] for level in levels)
+        terms |= {f"edu>={rank}" for rank in range(1, top + 1)}
+
+    years = features.get("experience_years", 0)
+    terms |= {f"exp>={bucket}" for bucket in EXPERIENCE_BUCKETS if years >= bucket}
+    return sorted(terms)
+
+
+class SkillIndex:
+    """Persistent inverted index from skills, certifications, education and experience to resumes.
+
+    Each resume gets a sequential document id, so posting lists stay sorted as resumes are
+    appended. Documents are persisted to an append-only JSON lines log that is replayed on load.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+        self._postings = {}
+        self._arrays = {}
+        self._docs_by_hash = {}
+        self.filenames = []
+        self.hashes = []
+        self.years = array("H")
+
+        if os.path.exists(path):
+            with open(path) as f:
+                for line in f:
+                    if line.strip():
+                        doc = json.loads(line)
+                        self._insert(doc["sha256"], doc["filename"], doc["experience_years"], doc["terms"])
+
+    def __len__(self):
+        return len(self.hashes)
+
+    def __contains__(self, sha256: str):
+        return sha256 in self._docs_by_hash
+
+    def _insert(self, sha256: str, filename: str, years: int, terms: List[str]) -> int:
+        doc_id = len(self.hashes)
+        self._docs_by_hash[sha256] = doc_id
+        self.hashes.append(sha256)
+        self.filenames.append(filename)
+        self.years.append(min(years, 65535))
+        for term in terms:
+            self._postings.setdefault(term, array("I")).append(doc_id)
+            self._arrays.pop(term, None)
+        return doc_id
+
+    def add(self, sha256: str, filename: str, features: Dict) -> int:
+        """Index a resume's features and return its document id; known resumes are skipped"""
+        with self._lock:
+            if sha256 in self._docs_by_hash:
+                return self._docs_by_hash[sha256]
+
+            years = features.get("experience_years", 0)
+            terms = index_terms(features)
+            with open(self.path, "a") as f:
+                f.write(json.dumps({"sha256": sha256, "filename": filename,
+                                    "experience_years": years, "terms": terms}) + "\n")
+            return self._insert(sha256, filename, years, terms)
+
+    def postings(self, term: str) -> np.ndarray:
+        """Return the sorted document ids for a term"""
+        cached = self._arrays.get(term)
+        if cached is None:
+            postings = self._postings.get(term)
+            if postings is None:
+                cached = np.zeros(0, dtype=np.uint32)
+            else:
+                # Copy out of the buffer: a live export would stop the array from growing
+                cached = np.frombuffer(postings, dtype=np.uint32).copy()
+            self._arrays[term] = cached
+        return cached
+
+    def _experience(self, op: str, value: str) -> np.ndarray:
+        try:
+            years = int(value)
+        except ValueError:
+            raise ValueError(f"Experience must be a whole number of years, got '{value}'")
+
+        if op in (">", "<="):
+            years += 1
+        if years <= 0:
+            matches = np.arange(len(self), dtype=np.uint32)
+        elif years in EXPERIENCE_BUCKETS:
+            matches = self.postings(f"exp>={years}")
+        else:
+            # Narrow the nearest lower bucket with the exact years
+            lower = [bucket for bucket in EXPERIENCE_BUCKETS if bucket < years]
+            candidates = self.postings(f"exp>={lower[-1]}") if lower else np.arange(len(self), dtype=np.uint32)
+            all_years = np.frombuffer(self.years, dtype=np.uint16) if len(self) else np.zeros(0, np.uint16)
+            matches = candidates[all_years[candidates] >= years]
+
+        if op in ("<", "<="):
+            return np.setdiff1d(np.arange(len(self), dtype=np.uint32), matches, assume_unique=True)
+        return matches
+
+    def _education(self, op: str, value: str) -> np.ndarray:
+        level = EDUCATION_ALIASES.get(normalize(value))
+        if level is None:
+            raise ValueError(f"Unknown education level '{value}'")
+        rank = EDUCATION_RANK[level] + (1 if op in (">", "<=") else 0)
+        matches = self.postings(f"edu>={rank}")
+        if op in ("<", "<="):
+            # Resumes with no recognized education count as below every level
+            return np.setdiff1d(np.arange(len(self), dtype=np.uint32), matches, assume_unique=True)
+        return matches
+
+    def _term(self, field: str, value: str) -> np.ndarray:
+        value = normalize(value)
+        if field == "skill":
+            return self.postings(f"skill:{value}")
+        if field == "cert":
+            return self.postings(f"cert:{value}")
+        if field == "edu":
+            level = EDUCATION_ALIASES.get(value)
+            if level is None:
+                raise ValueError(f"Unknown education level '{value}'")
+            return self.postings(f"edu:{level}")
+        if field == "exp":
+            return self._experience(">=", value)
+        if field == "phrase":
+            return self._phrase(value)
+
+        # Unquoted words split into the longest known phrases, which are ANDed together
+        words = value.split()
+        parts = []
+        start = 0
+        while start < len(words):
+            stop = len(words)
+            while stop > start + 1 and not self._known(" ".join(words[start:stop])):
+                stop -= 1
+            parts.append(self._phrase(" ".join(words[start:stop])))
+            start = stop
+
+        parts.sort(key=len)
+        result = parts[0]
+        for postings in parts[1:]:
+            result = np.intersect1d(result, postings, assume_unique=True)
+        return result
+
+    def _known(self, phrase: str) -> bool:
+        return (phrase in EDUCATION_ALIASES or f"skill:{phrase}" in self._postings
+                or f"cert:{phrase}" in self._postings)
+
+    def _phrase(self, phrase: str) -> np.ndarray:
+        """A bare phrase matches an education level, or else a skill or certification"""
+        if phrase in EDUCATION_ALIASES:
+            return self.postings(f"edu:{EDUCATION_ALIASES[phrase]}")
+        return np.union1d(self.postings(f"skill:{phrase}"), self.postings(f"cert:{phrase}"))
+
+    def search(self, query: str) -> np.ndarray:
+        """Evaluate a boolean query and return the matching document ids.
+
+        Example: ``python AND kubernetes AND exp>=5 AND (master's OR phd) AND NOT cert:pmp``.
+        Terms may be qualified with skill:, cert:, edu: or exp:. Adjacent unquoted words are
+        split into the longest known terms and ANDed, so ``machine learning python`` means
+        ``"machine learning" AND python``; quoted text is always one term, also when qualified
+        (``cert:"aws certified"``). Comparisons work on
+        experience (``exp>4``, ``5+ years``) and education (``edu<master``, ``>= master``).
+        Raises ValueError on a malformed query.
+        """
+        with self._lock:
+            return _QueryParser(self, query).parse()
+
+    def document(self, doc_id: int) -> Dict:
+        return {
+            "filename": self.filenames[doc_id],
+            "sha256": self.hashes[doc_id],
+            "experience_years": self.years[doc_id],
+        }
+
+
+class _QueryParser:
+    """Recursive descent parser evaluating a query directly into posting lists"""
+
+    def __init__(self, index: SkillIndex, query: str):
+        self.index = index
+        self.tokens = self._tokenize(query)
+        self.pos = 0
+
+    def _tokenize(self, query: str) -> List[tuple]:
+        tokens = []
+        after_word = False
+        for match in TOKEN_PATTERN.finditer(query):
+            previous_word, after_word = after_word, False
+            if match.group("paren"):
+                tokens.append(("paren", match.group("paren")))
+            elif match.group("qfield"):
+                field = FIELD_PREFIXES.get(match.group("qfield").lower())
+                if field is None:
+                    raise ValueError(f"Unknown field '{match.group('qfield')}' in query")
+                tokens.append(("term", (field, match.group("qvalue"))))
+            elif match.group("quoted") is not None:
+                tokens.append(("term", ("phrase", match.group("quoted"))))
+            elif match.group("compare"):
+                field = FIELD_PREFIXES.get((match.group("field") or "exp").lower())
+                op = match.group("op").replace("≥", ">=").replace("≤", "<=")
+                value = match.group("cvalue") if match.group("cvalue") is not None else match.group("value").rstrip("+")
+                if match.group("field") is None and not re.fullmatch(r"[\d.]+", value):
+                    # ">= master" reads as an education comparison
+                    field = "edu"
+                if field not in ("exp", "edu"):
+                    raise ValueError(f"Comparisons are only supported for experience and education: '{match.group(0)}'")
+                tokens.append(("compare", (field, op, value)))
+            elif match.group("years"):
+                tokens.append(("compare", ("exp", ">=", match.group("count"))))
+            else:
+                word = match.group("word")
+                if word.upper() in OPERATORS:
+                    tokens.append(("op", word.upper()))
+                elif previous_word and tokens[-1][1][0] is None and ":" not in word:
+                    # Adjacent bare words are split into known phrases when evaluated
+                    tokens[-1] = ("term", (None, f"{tokens[-1][1][1]} {word}"))
+                    after_word = True
+                else:
+                    after_word = True
+                    field, sep, value = word.partition(":")
+                    if sep and field.lower() in FIELD_PREFIXES:
+                        tokens.append(("term", (FIELD_PREFIXES[field.lower()], value)))
+                    else:
+                        tokens.append(("term", (None, word)))
+        return tokens
+
+    def _peek(self):
+        return self.tokens[self.pos] if self.pos < len(self.tokens) else (None, None)
+
+    def _next(self):
+        token = self._peek()
+        self.pos += 1
+        return token
+
+    def parse(self) -> np.ndarray:
+        if not self.tokens:
+            raise ValueError("Query is empty")
+        result = self._or()
+        if self.pos < len(self.tokens):
+            raise ValueError(f"Unexpected '{self.tokens[self.pos][1]}' in query")
+        return result
+
+    def _or(self) -> np.ndarray:
+        result = self._and()
+        while self._peek() == ("op", "OR"):
+            self._next()
+            result = np.union1d(result, self._and())
+        return result
+
+    def _and(self) -> np.ndarray:
+        positive, negative = [], []
+        while True:
+            negate = False
+            while self._peek() == ("op", "NOT"):
+                self._next()
+                negate = not negate
+            (negative if negate else positive).append(self._atom())
+            if self._peek() == ("op", "AND"):
+                self._next()
+            elif self._peek() == ("op", "NOT"):
+                # "python NOT java" reads as "python AND NOT java"
+                continue
+            elif self._peek()[0] not in ("term", "compare", "paren") or self._peek() == ("paren", ")"):
+                break
+
+        # Intersect the shortest posting lists first so the working set shrinks fast
+        if positive:
+            positive.sort(key=len)
+            result = positive[0]
+            for postings in positive[1:]:
+                if not len(result):
+                    break
+                result = np.intersect1d(result, postings, assume_unique=True)
+        else:
+            result = np.arange(len(self.index), dtype=np.uint32)
+        for postings in negative:
+            result = np.setdiff1d(result, postings, assume_unique=True)
+        return result
+
+    def _atom(self) -> np.ndarray:
+        kind, value = self._next()
+        if kind == "paren" and value == "(":
+            result = self._or()
+            if self._next() != ("paren", ")"):
+                raise ValueError("Unbalanced parentheses in query")
+            return result
+        if kind == "term":
+            return self.index._term(*value)
+        if kind == "compare":
+            field, op, operand = value
+            if field == "edu":
+                return self.index._education(op, operand)
+            return self.index._experience(op, operand)
+        raise ValueError("Expected a term in query" if kind is None else f"Unexpected '{value}' in query")
@@ -5,3 +5,417 @@ app = FastAPI()
 @app.get("/")
 async def root():
     return {"message": "Hello World"}
+
+# Skill index query behaviour
+
+import pytest
+
+from app.skill_index import SkillIndex
+
+RESUMES = [
+    ("a.pdf", {"skills": ["Python", "Kubernetes"], "certifications": ["Pmp"],
+               "education": "Master's Degree; in Computer Science", "experience_years": 5}),
+    ("b.pdf", {"skills": ["Java", "Machine Learning"], "certifications": [],
+               "education": "Bachelor's Degree", "experience_years": 4}),
+    ("c.pdf", {"skills": ["Python", "Java", "Machine Learning"], "certifications": [],
+               "education": "Ph.D.", "experience_years": 6}),
+    ("d.pdf", {"skills": ["Python"], "certifications": [],
+               "education": "Not specified", "experience_years": 0}),
+]
+
+@pytest.fixture
+def index(tmp_path):
+    index = SkillIndex(str(tmp_path / "skill_index.jsonl"))
+    for filename, features in RESUMES:
+        index.add(filename, filename, features)
+    return index
+
+def matches(index, query):
+    return [index.document(int(doc_id))["filename"] for doc_id in index.search(query)]
+
+def test_adjacent_words_split_into_known_terms(index):
+    assert matches(index, "python java") == ["c.pdf"]
+    assert matches(index, "machine learning") == ["b.pdf", "c.pdf"]
+    assert matches(index, "machine learning python") == ["c.pdf"]
+    assert matches(index, '"python java"') == []
+
+def test_qualified_term_followed_by_word_is_implicit_and(index):
+    assert matches(index, "skill:python kubernetes") == ["a.pdf"]
+    assert matches(index, "skill:python AND kubernetes") == ["a.pdf"]
+
+def test_boolean_operators_and_parentheses(index):
+    assert matches(index, "python AND NOT kubernetes") == ["c.pdf", "d.pdf"]
+    assert matches(index, "(java OR cert:pmp) AND python") == ["a.pdf", "c.pdf"]
+    assert matches(index, "NOT python") == ["b.pdf"]
+    # NOT between terms is an implicit AND NOT
+    assert matches(index, "python NOT java") == ["a.pdf", "d.pdf"]
+    assert matches(index, "python NOT java NOT kubernetes") == ["d.pdf"]
+    assert matches(index, "java OR python NOT kubernetes") == ["b.pdf", "c.pdf", "d.pdf"]
+
+def test_education_comparisons(index):
+    assert matches(index, "master's") == ["a.pdf"]
+    assert matches(index, "edu>=master") == ["a.pdf", "c.pdf"]
+    assert matches(index, "edu>master") == ["c.pdf"]
+    assert matches(index, "edu<master") == ["b.pdf", "d.pdf"]
+    assert matches(index, "edu<=master") == ["a.pdf", "b.pdf", "d.pdf"]
+    # A comparison on a non-number reads as education
+    assert matches(index, ">= master") == ["a.pdf", "c.pdf"]
+
+def test_underscore_aliases_and_quoted_qualified_terms(index):
+    index.add("e.pdf", "e.pdf", {"skills": ["Excel"], "certifications": ["Aws Certified"],
+                                 "education": "High School", "experience_years": 1})
+    assert matches(index, "edu:high_school") == ["e.pdf"]
+    assert matches(index, "edu>=high_school AND exp<2") == ["e.pdf"]
+    assert matches(index, 'edu<="high school"') == ["d.pdf", "e.pdf"]
+    assert matches(index, 'cert:"aws certified"') == ["e.pdf"]
+    assert matches(index, 'cert:"aws certified" AND excel') == ["e.pdf"]
+    assert matches(index, 'skill:"machine learning" NOT python') == ["b.pdf"]
+    # Quoted, the qualifier applies to the whole phrase rather than its first word
+    assert matches(index, 'skill:"aws certified"') == []
+
+def test_experience_bucket_boundaries(index):
+    # 5 is a bucket, 4 and 6 are not
+    assert matches(index, "exp>=5") == ["a.pdf", "c.pdf"]
+    assert matches(index, "exp>5") == ["c.pdf"]
+    assert matches(index, "exp<=5") == ["a.pdf", "b.pdf", "d.pdf"]
+    assert matches(index, "exp<5") == ["b.pdf", "d.pdf"]
+    assert matches(index, "exp>4") == ["a.pdf", "c.pdf"]
+    assert matches(index, "exp>=4") == ["a.pdf", "b.pdf", "c.pdf"]
+    assert matches(index, "exp>=0") == ["a.pdf", "b.pdf", "c.pdf", "d.pdf"]
+    assert matches(index, "Python AND Kubernetes AND ≥5 years AND Master's") == ["a.pdf"]
+    assert matches(index, "6+ years") == ["c.pdf"]
+
+@pytest.mark.parametrize("query", ["", "python AND", "(python", "python)", "foo>=3", "edu>=wizard", "exp>=many"])
+def test_malformed_queries_raise_value_error(index, query):
+    with pytest.raises(ValueError):
+        index.search(query)
+
+@pytest.mark.parametrize("query, message", [
+    ("exp>=2.5", "whole number of years"),
+    (">= 2.5", "whole number of years"),
+    ("years>=master", "whole number of years"),
+    ('foo:"bar"', "Unknown field"),
+])
+def test_malformed_query_messages(index, query, message):
+    with pytest.raises(ValueError, match=message):
+        index.search(query)
+
+def test_index_reloads_from_log(index):
+    index.add("e.pdf", "e.pdf", {"skills": ["Go"], "experience_years": 12})
+    reloaded = SkillIndex(index.path)
+
+    assert len(reloaded) == 5
+    assert "e.pdf" in reloaded
+    assert matches(reloaded, "go AND exp>=10") == ["e.pdf"]
+    assert matches(reloaded, "python java") == ["c.pdf"]
+    # Re-adding a known resume is a no-op
+    assert reloaded.add("a.pdf", "a.pdf", RESUMES[0][1]) == 0
+    assert len(reloaded) == 5
+
+# Admission control
+
+import asyncio
+import io
+from types import SimpleNamespace
+from typing import List
+
+import docx
+import fitz
+from fastapi import File, UploadFile
+from fastapi.testclient import TestClient
+
+import app.admission as admission_module
+from app.admission import AdmissionController, ExtractionBudget, Rejected, admission_route
+
+def test_slot_rejects_with_429_when_queue_is_full():
+    controller = AdmissionController(max_in_flight=1, max_queue=0, retry_after=2)
+
+    async def scenario():
+        async with controller.slot():
+            with pytest.raises(Rejected) as excinfo:
+                async with controller.slot():
+                    pass
+        return excinfo.value
+
+    rejected = asyncio.run(scenario())
+    assert rejected.status_code == 429
+    assert rejected.headers == {"Retry-After": "2"}
+    assert controller.metrics()["rejected"] == {"queue_full": 1}
+    assert controller.in_flight == 0
+
+def test_slot_times_out_with_503():
+    controller = AdmissionController(max_in_flight=1, max_queue=1, queue_timeout=0.05, retry_after=3)
+
+    async def scenario():
+        async with controller.slot():
+            with pytest.raises(Rejected) as excinfo:
+                async with controller.slot():
+                    pass
+        return excinfo.value
+
+    rejected = asyncio.run(scenario())
+    assert rejected.status_code == 503
+    # One request was waiting when the timeout fired
+    assert rejected.headers == {"Retry-After": "6"}
+    assert controller.queued == 0
+    assert controller.metrics()["rejected"] == {"queue_timeout": 1}
+
+def test_slot_queues_until_a_slot_frees():
+    controller = AdmissionController(max_in_flight=1, max_queue=2, queue_timeout=1)
+    order = []
+
+    async def job(name):
+        async with controller.slot():
+            order.append(name)
+            await asyncio.sleep(0.01)
+
+    async def scenario():
+        await asyncio.gather(job("a"), job("b"), job("c"))
+
+    asyncio.run(scenario())
+    assert order == ["a", "b", "c"]
+    metrics = controller.metrics()
+    assert (metrics["admitted"], metrics["completed"], metrics["in_flight"], metrics["queued"]) == (3, 3, 0, 0)
+    assert metrics["rejected"] == {}
+
+def upload(name, data):
+    return SimpleNamespace(filename=name, file=io.BytesIO(data))
+
+def test_budget_refuses_and_removes_oversized_files(tmp_path, monkeypatch):
+    monkeypatch.setattr(admission_module, "MAX_FILE_BYTES", 10)
+    budget = ExtractionBudget(AdmissionController())
+
+    budget.save(upload("small.pdf", b"x" * 10), str(tmp_path / "small.pdf"))
+    with pytest.raises(Rejected) as excinfo:
+        budget.save(upload("big.pdf", b"x" * 11), str(tmp_path / "big.pdf"))
+
+    assert excinfo.value.status_code == 413
+    assert (tmp_path / "small.pdf").exists()
+    assert not (tmp_path / "big.pdf").exists()
+
+def write_pdf(path, pages):
+    pdf = fitz.open()
+    for number in range(pages):
+        pdf.new_page().insert_text((72, 72), f"page {number}")
+    pdf.save(str(path))
+    pdf.close()
+
+def test_budget_enforces_total_pages(tmp_path, monkeypatch):
+    monkeypatch.setattr(admission_module, "MAX_TOTAL_PAGES", 3)
+    controller = AdmissionController()
+    budget = ExtractionBudget(controller)
+    write_pdf(tmp_path / "a.pdf", 2)
+    write_pdf(tmp_path / "b.pdf", 2)
+
+    assert "page 1" in budget.extract(str(tmp_path / "a.pdf"))
+    with pytest.raises(Rejected) as excinfo:
+        budget.extract(str(tmp_path / "b.pdf"))
+
+    assert excinfo.value.status_code == 413
+    assert not (tmp_path / "b.pdf").exists()
+    assert controller.rejected == {"too_many_pages": 1}
+
+def test_budget_enforces_total_characters(tmp_path, monkeypatch):
+    monkeypatch.setattr(admission_module, "MAX_TOTAL_CHARS", 30)
+    controller = AdmissionController()
+    budget = ExtractionBudget(controller)
+    for name, text in [("a.docx", "x" * 20), ("b.docx", "y" * 20)]:
+        document = docx.Document()
+        document.add_paragraph(text)
+        document.save(str(tmp_path / name))
+
+    assert budget.extract(str(tmp_path / "a.docx")) == "x" * 20
+    with pytest.raises(Rejected) as excinfo:
+        budget.extract(str(tmp_path / "b.docx"))
+
+    assert excinfo.value.status_code == 413
+    assert not (tmp_path / "b.docx").exists()
+    assert controller.rejected == {"too_many_chars": 1}
+
+@pytest.fixture
+def upload_app():
+    controller = AdmissionController(max_in_flight=1, max_queue=0)
+    api = FastAPI()
+    api.router.route_class = admission_route(controller)
+    received = []
+
+    @api.post("/upload/")
+    async def upload_api(files: List[UploadFile] = File(...)):
+        received.append(len(files))
+        return {"files": len(files)}
+
+    @api.get("/metrics")
+    async def metrics_api():
+        return controller.metrics()
+
+    return TestClient(api), controller, received
+
+def test_route_refuses_large_content_length_before_parsing(upload_app, monkeypatch):
+    client, controller, received = upload_app
+    monkeypatch.setattr(admission_module, "MAX_REQUEST_BYTES", 100)
+
+    response = client.post("/upload/", files=[("files", ("a.pdf", b"x" * 200))])
+
+    assert response.status_code == 413
+    assert received == []
+    assert controller.rejected == {"request_too_large": 1}
+
+def test_route_refuses_too_many_files(upload_app, monkeypatch):
+    client, controller, received = upload_app
+    monkeypatch.setattr(admission_module, "MAX_FILES", 2)
+
+    assert client.post("/upload/", files=[("files", ("a.pdf", b"x"))] * 2).json() == {"files": 2}
+    response = client.post("/upload/", files=[("files", ("a.pdf", b"x"))] * 3)
+
+    assert response.status_code == 413
+    assert controller.rejected == {"too_many_files": 1}
+
+def test_route_rejects_busy_server_before_parsing(upload_app):
+    client, controller, received = upload_app
+    # Hold the only slot; an uncontended acquire does not bind the semaphore to this loop
+    asyncio.run(controller._semaphore.acquire())
+
+    # A body that would fail to parse shows the request never got that far
+    response = client.post("/upload/", content=b"not multipart",
+                           headers={"content-type": "multipart/form-data; boundary=x"})
+
+    assert response.status_code == 429
+    assert response.headers["retry-after"] == str(controller.retry_after)
+    assert received == []
+    # Routes without a body are not held back
+    assert client.get("/metrics").json()["rejected"] == {"queue_full": 1}
+
+# Embedding store
+
+import numpy as np
+
+import app.embedding_store as embedding_store_module
+from app.embedding_store import EmbeddingStore, content_hash, quantize
+
+def test_quantize_normalizes_and_fits_int8():
+    vec = np.array([3.0, -4.0, 0.0, 1e-3], dtype=np.float32)
+    values, scale = quantize(vec, "int8")
+
+    assert values.dtype == np.int8
+    assert np.abs(values).max() == 127
+    assert scale == pytest.approx(0.8 / 127)
+    np.testing.assert_allclose(values * scale, vec / np.linalg.norm(vec), atol=scale / 2)
+
+    values, scale = quantize(vec, "float16")
+    assert values.dtype == np.float16 and scale == 1.0
+    assert np.linalg.norm(values.astype(np.float32)) == pytest.approx(1.0, abs=1e-3)
+
+    # A zero vector stays zero instead of dividing by zero
+    values, scale = quantize(np.zeros(4), "int8")
+    assert not values.any() and scale == 1.0
+
+def test_store_grows_and_reopens(tmp_path, monkeypatch):
+    monkeypatch.setattr(embedding_store_module, "GROW_ROWS", 16)
+    rng = np.random.default_rng(0)
+    vectors = rng.standard_normal((40, 8)).astype(np.float32)
+    hashes = [content_hash(str(i)) for i in range(40)]
+
+    store = EmbeddingStore(str(tmp_path), dim=8)
+    assert store.add_many(list(zip(hashes[:10], vectors[:10]))) == list(range(10))
+    # The second batch overflows the initial capacity and remaps the files
+    assert store.add_many(list(zip(hashes[10:], vectors[10:]))) == list(range(10, 40))
+
+    reopened = EmbeddingStore(str(tmp_path))
+    assert (len(reopened), reopened.dim, reopened.dtype) == (40, 8, "int8")
+    assert [reopened.metadata(row)["sha256"] for row in range(40)] == hashes
+    assert reopened.search(vectors[25], top_k=1)[0][0] == 25
+    assert reopened.add(content_hash("new"), vectors[0]) == 40
+
+def test_store_rejects_conflicting_header(tmp_path):
+    EmbeddingStore(str(tmp_path), dim=8, dtype="float16")
+
+    assert EmbeddingStore(str(tmp_path), dim=8, dtype="float16").dtype == "float16"
+    with pytest.raises(ValueError, match="dim"):
+        EmbeddingStore(str(tmp_path), dim=16)
+    with pytest.raises(ValueError, match="dtype"):
+        EmbeddingStore(str(tmp_path), dtype="int8")
+
+def test_search_matches_exact_cosine_ranking_across_blocks(tmp_path):
+    rng = np.random.default_rng(1)
+    vectors = rng.standard_normal((3000, 32)).astype(np.float32)
+    query = rng.standard_normal(32).astype(np.float32)
+    store = EmbeddingStore(str(tmp_path), dim=32, dtype="int8")
+    store.add_many([(content_hash(str(i)), vector) for i, vector in enumerate(vectors)])
+
+    exact = (vectors / np.linalg.norm(vectors, axis=1, keepdims=True)) @ (query / np.linalg.norm(query))
+    results = store.search(query, top_k=10, block_size=100)
+
+    assert [row for row, _ in results] == np.argsort(-exact)[:10].tolist()
+    np.testing.assert_allclose([score for _, score in results], np.sort(exact)[::-1][:10], atol=0.01)
+    assert store.search(query, top_k=0) == []
+
+# Feature cache and scoring
+
+from app.feature_cache import DEFAULT_WEIGHTS, FeatureCache, MissingResumeFeatures, combine_scores, normalize_weights
+
+def test_normalize_weights_fills_defaults():
+    assert normalize_weights() == DEFAULT_WEIGHTS
+    assert normalize_weights({"skill_match": 2}) == {**DEFAULT_WEIGHTS, "skill_match": 2.0}
+    assert normalize_weights({"similarity": 0, "keyword_relevance": 0.5})["similarity"] == 0.0
+
+@pytest.mark.parametrize("weights", [
+    {"similarity": float("nan")}, {"similarity": float("inf")}, {"similarity": None},
+    {"similarity": True}, {"similarity": "1"}, {"similarity": -1}, {"seniority": 1},
+    {"similarity": 0}, [("similarity", 1)],
+])
+def test_normalize_weights_rejects_invalid(weights):
+    with pytest.raises(ValueError):
+        normalize_weights(weights)
+
+COMPONENTS = {"similarity": 80.0, "skill_match": 50.0, "experience_match": 100.0,
+              "keyword_relevance": 15.0, "content_completeness": 20.0}
+
+def test_combine_scores_scales_components_to_100():
+    # Keyword relevance is out of 30 and completeness out of 40
+    assert combine_scores(COMPONENTS, {"keyword_relevance": 1.0}) == 50.0
+    assert combine_scores(COMPONENTS, {"content_completeness": 1.0}) == 50.0
+    assert combine_scores(COMPONENTS, {"similarity": 1.0, "experience_match": 3.0}) == 95.0
+
+def test_default_weights_reproduce_similarity_ranking():
+    rng = np.random.default_rng(2)
+    candidates = [{name: float(rng.uniform(0, 30)) for name in COMPONENTS} for _ in range(50)]
+    weights = normalize_weights()
+
+    by_score = sorted(range(50), key=lambda i: combine_scores(candidates[i], weights), reverse=True)
+    by_similarity = sorted(range(50), key=lambda i: candidates[i]["similarity"], reverse=True)
+    assert by_score == by_similarity
+
+def test_screening_round_trip_keeps_duplicates_in_order(tmp_path):
+    cache = FeatureCache(str(tmp_path / "features.db"))
+    scores = [
+        {"sha256": "b", "filename": "b.pdf", "similarity": 70.0, "skill_match": 10.0, "keyword_relevance": 3.0},
+        {"sha256": "a", "filename": "a.pdf", "similarity": 90.0, "skill_match": 50.0, "keyword_relevance": 9.0},
+        {"sha256": "b", "filename": "b-copy.pdf", "similarity": 70.0, "skill_match": 10.0, "keyword_relevance": 3.0},
+    ]
+    screening_id = cache.save_screening("jd", {"skills": ["Python"]}, np.arange(4), DEFAULT_WEIGHTS, scores)
+
+    screening = cache.get_screening(screening_id)
+    assert screening["scores"] == scores
+    assert screening["jd_features"] == {"skills": ["Python"]}
+    assert screening["jd_embedding"].tolist() == [0, 1, 2, 3]
+
+    # Saving again under the same id replaces the rows instead of appending
+    cache.save_screening("jd", {}, np.arange(4), DEFAULT_WEIGHTS, scores[:1], screening_id=screening_id)
+    assert cache.get_screening(screening_id)["scores"] == scores[:1]
+    with pytest.raises(KeyError):
+        cache.get_screening("missing")
+
+def test_rescore_reports_missing_resume_features(tmp_path):
+    nlp_utils = pytest.importorskip("app.nlp_utils")
+    cache = FeatureCache(str(tmp_path / "features.db"))
+    cache.put_resume("a", "a.pdf", 0, {"experience_years": 1, "content_completeness": 10, "skills": []})
+    scores = [
+        {"sha256": "a", "filename": "a.pdf", "similarity": 90.0, "skill_match": 0.0, "keyword_relevance": 0.0},
+        {"sha256": "gone", "filename": "gone.pdf", "similarity": 80.0, "skill_match": 0.0, "keyword_relevance": 0.0},
+    ]
+    screening_id = cache.save_screening("jd", {"experience_years": 0}, np.zeros(4), DEFAULT_WEIGHTS, scores)
+
+    with pytest.raises(MissingResumeFeatures) as excinfo:
+        nlp_utils.rescore_screening(screening_id, None, cache)
+    assert excinfo.value.filenames == ["gone.pdf"]
+    assert not isinstance(excinfo.value, KeyError)